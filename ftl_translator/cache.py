@@ -0,0 +1,94 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class TranslationCache:
+    """
+    Persistent SQLite cache of translations keyed by (source, target, text).
+    """
+
+    def __init__(self, path: str | Path, ttl: float | None = None):
+        """
+        Initialize the cache.
+        @param path: path to the SQLite database file
+        @param ttl: seconds after which a cached translation expires, None to keep forever
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """
+        Open the database and create the cache table if needed.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL делает commit на каждую запись дешевым
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key BLOB PRIMARY KEY, translated TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        connection.commit()
+        self._connection = connection
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def make_key(text: str, source: str, target: str) -> bytes:
+        return hashlib.blake2b(
+            f"{source}|{target}|{text}".encode(), digest_size=16
+        ).digest()
+
+    def get_many(self, texts: list[str], source: str, target: str) -> dict[str, str]:
+        """
+        Get cached translations.
+        @return: dict: text -> translated text, without missing or expired texts
+        """
+        assert self._connection is not None, "Cache is not opened"
+        now = time.time()
+        translations = {}
+        with self._lock:
+            for text in texts:
+                row = self._connection.execute(
+                    "SELECT translated, created_at FROM cache WHERE key = ?",
+                    (self.make_key(text, source, target),),
+                ).fetchone()
+                if row is None:
+                    continue
+                translated, created_at = row
+                if self.ttl is not None and now - created_at > self.ttl:
+                    continue
+                translations[text] = translated
+        return translations
+
+    def set_many(self, translations: dict[str, str], source: str, target: str) -> None:
+        """
+        Store translations in a single transaction.
+        @param translations: text -> translated text
+        """
+        assert self._connection is not None, "Cache is not opened"
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO cache (key, translated, created_at) VALUES (?, ?, ?)",
+                (
+                    (self.make_key(text, source, target), translated, now)
+                    for text, translated in translations.items()
+                ),
+            )
+            self._connection.commit()
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import re
+
 from fluent.syntax import parse, ast
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 from dataclasses import dataclass, field
 
+# Индекс переменной в тексте, например {0}
+VARIABLE_INDEX_RE = re.compile(r"\{(\d+)\}")
+
 
 # Датакласс для хранения информации о сообщениях
 @dataclass
@@ -23,49 +28,52 @@ class MessageInfo:
 
     def restore_text_with_variables(self) -> str:
         """Восстанавливает текст сообщения, заменяя индексы переменных на их оригинальные значения."""
-        restored_text = self.text
+        variables = {}
         for i, var_name in enumerate(self.all_variables):
             if not var_name.startswith("-"):
                 var_name = f"${var_name}"
-            restored_text = restored_text.replace(f"{{{i}}}", f"{{ {var_name} }}")
+            variables[str(i)] = f"{{ {var_name} }}"
 
-        return restored_text
+        # один проход по тексту вместо replace на каждую переменную
+        return VARIABLE_INDEX_RE.sub(
+            lambda m: variables.get(m.group(1), m.group(0)), self.text
+        )
 
     def to_fluent(self) -> str:
         """Восстанавливает оригинальный формат .ftl сообщения."""
         restored = self.restore_text_with_variables()
         # ставим 4 пробела перед каждой новой строкой
-        fluent_text = f"{self.name} =\n    {restored.replace('\n', '\n    ')}"
-        return fluent_text
+        body = "\n    ".join(restored.split("\n"))
+        return f"{self.name} =\n    {body}"
 
 
 # Функция для замены переменных на индексы в шаблоне текста
 def replace_variables_with_indexes(pattern: ast.Pattern) -> Tuple[str, List[str], List[str], str]:
-    text = ""
+    text_parts = []
     user_variables = []
     term_variables = []
     all_variables = []  # Список для хранения всех переменных с индексами
     index = 0
-    original_text = ""
+    original_parts = []
 
     for element in pattern.elements:
         if isinstance(element, ast.TextElement):
-            text += element.value
-            original_text += element.value
+            text_parts.append(element.value)
+            original_parts.append(element.value)
         elif isinstance(element, ast.Placeable):
             # Получаем текст для Placeable и обновляем индексы
             placeable_text, placeable_original, placeable_variables, placeable_terms = (
                 process_placeable(element, index)
             )
             # Используем полное значение вместо индекса для сложных выражений
-            text += placeable_text
-            original_text += placeable_original
+            text_parts.append(placeable_text)
+            original_parts.append(placeable_original)
             user_variables.extend(placeable_variables)
             term_variables.extend(placeable_terms)
             all_variables.extend(placeable_variables + placeable_terms)
             index += 1
 
-    return text, user_variables, term_variables, original_text
+    return "".join(text_parts), user_variables, term_variables, "".join(original_parts)
 
 
 # Функция для обработки Placeable
@@ -73,43 +81,67 @@ def process_placeable(
     placeable: ast.Placeable, index: int
 ) -> Tuple[str, str, List[str], List[str]]:
     expression = placeable.expression
-    variables = []
-    term_variables = []
-    text = ""
-    original_text = ""
-
-    if isinstance(expression, ast.VariableReference):
-        var_name = expression.id.name
-        variables.append(var_name)
-        text = f"{{{index}}}"
-        original_text = f"{{ ${var_name} }}"
-    elif isinstance(expression, ast.TermReference):
-        term_name = expression.id.name
-        term_variables.append(term_name)
-        text = f"{{{index}}}"
-        original_text = f"{{ -{term_name} }}"
-    elif isinstance(expression, ast.MessageReference):
-        message_name = expression.id.name
-        variables.append(message_name)
-        text = f"{{{index}}}"
-        original_text = f"{{ ${message_name} }}"
-    elif isinstance(expression, ast.SelectExpression):
-        # Обработка SelectExpression
-        select_text, select_variables, select_terms, select_original_text = (
-            process_select_expression(expression)
-        )
-        variables.extend(select_variables)
-        term_variables.extend(select_terms)
-        text = select_text
-        original_text = select_original_text
-    elif isinstance(expression, ast.StringLiteral):
-        original_text = f'"{expression.value}"'
-        text = original_text
-    elif isinstance(expression, ast.NumberLiteral):
-        original_text = f"{expression.value}"
-        text = original_text
+    handler = PLACEABLE_HANDLERS.get(type(expression))
+    if handler is None:
+        return "", "", [], []
+    return handler(expression, index)
+
+
+def process_variable_reference(
+    expression: ast.VariableReference, index: int
+) -> Tuple[str, str, List[str], List[str]]:
+    var_name = expression.id.name
+    return f"{{{index}}}", f"{{ ${var_name} }}", [var_name], []
+
+
+def process_term_reference(
+    expression: ast.TermReference, index: int
+) -> Tuple[str, str, List[str], List[str]]:
+    term_name = f"-{expression.id.name}"
+    return f"{{{index}}}", f"{{ {term_name} }}", [], [term_name]
+
 
-    return text, original_text, variables, term_variables
+def process_message_reference(
+    expression: ast.MessageReference, index: int
+) -> Tuple[str, str, List[str], List[str]]:
+    message_name = expression.id.name
+    return f"{{{index}}}", f"{{ ${message_name} }}", [message_name], []
+
+
+def process_select_placeable(
+    expression: ast.SelectExpression, index: int
+) -> Tuple[str, str, List[str], List[str]]:
+    select_text, select_variables, select_terms, select_original_text = (
+        process_select_expression(expression)
+    )
+    return select_text, select_original_text, select_variables, select_terms
+
+
+def process_string_literal(
+    expression: ast.StringLiteral, index: int
+) -> Tuple[str, str, List[str], List[str]]:
+    original_text = f'"{expression.value}"'
+    return original_text, original_text, [], []
+
+
+def process_number_literal(
+    expression: ast.NumberLiteral, index: int
+) -> Tuple[str, str, List[str], List[str]]:
+    original_text = f"{expression.value}"
+    return original_text, original_text, [], []
+
+
+# Обработчики выражений Placeable по типу выражения
+PLACEABLE_HANDLERS: Dict[
+    type, Callable[[Any, int], Tuple[str, str, List[str], List[str]]]
+] = {
+    ast.VariableReference: process_variable_reference,
+    ast.TermReference: process_term_reference,
+    ast.MessageReference: process_message_reference,
+    ast.SelectExpression: process_select_placeable,
+    ast.StringLiteral: process_string_literal,
+    ast.NumberLiteral: process_number_literal,
+}
 
 
 # Функция для обработки SelectExpression
@@ -118,12 +150,12 @@ def process_select_expression(
 ) -> Tuple[str, List[str], List[str], str]:
     variables = []
     term_variables = []
-    original_text = f"{{ {expression.selector.id.name} ->\n"
+    original_parts = [f"{{ {expression.selector.id.name} ->\n"]
 
     if isinstance(expression.selector, ast.VariableReference):
         variables.append(expression.selector.id.name)
     elif isinstance(expression.selector, (ast.MessageReference, ast.TermReference)):
-        term_variables.append(expression.selector.id.name)
+        term_variables.append(f"-{expression.selector.id.name}")
 
     # Обработка вариантов в SelectExpression
     for variant in expression.variants:
@@ -133,9 +165,10 @@ def process_select_expression(
             )
             variables.extend(variant_variables)
             term_variables.extend(variant_terms)
-            original_text += f"   [{variant.key.name}] {variant_original_text}\n"
+            original_parts.append(f"   [{variant.key.name}] {variant_original_text}\n")
 
-    original_text += "}"
+    original_parts.append("}")
+    original_text = "".join(original_parts)
     return original_text, variables, term_variables, original_text
 
 
@@ -159,19 +192,19 @@ def get_message_info(resource: ast.Resource) -> List[MessageInfo]:
                 message_text, user_variables, term_variables, original_text = (
                     replace_variables_with_indexes(entry.value)
                 )
-                term_variables = [f"-{term}" for term in term_variables]
                 all_variables = user_variables + term_variables
 
-            # Обработка атрибутов (если необходимо)
-            for attribute in entry.attributes:
-                attr_text, attr_user_vars, attr_term_vars, attr_original_text = (
-                    replace_variables_with_indexes(attribute.value)
-                )
-                message_text += f"\n.{attribute.id.name} = {attr_text}"
-                original_text += f"\n.{attribute.id.name} = {attr_original_text}"
-                user_variables.extend(attr_user_vars)
-                term_variables.extend(attr_term_vars)
-                all_variables.extend(attr_user_vars + attr_term_vars)
+            # Обработка атрибутов (у большинства сообщений их нет)
+            if entry.attributes:
+                for attribute in entry.attributes:
+                    attr_text, attr_user_vars, attr_term_vars, attr_original_text = (
+                        replace_variables_with_indexes(attribute.value)
+                    )
+                    message_text += f"\n.{attribute.id.name} = {attr_text}"
+                    original_text += f"\n.{attribute.id.name} = {attr_original_text}"
+                    user_variables.extend(attr_user_vars)
+                    term_variables.extend(attr_term_vars)
+                    all_variables.extend(attr_user_vars + attr_term_vars)
 
             messages_info.append(
                 MessageInfo(
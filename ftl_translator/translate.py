@@ -1,4 +1,9 @@
 import asyncio
+import copy
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import StrEnum
 from pathlib import Path
@@ -8,10 +13,24 @@ import logging
 
 from ftl_translator.extractor import MessageInfo
 from ftl_translator.translator import GoogleTranslator
-import aiofiles
+from ftl_translator.utils import gather
 
 logger = logging.getLogger(__name__)
 
+# с какого числа файлов парсить их в пуле процессов
+PARSE_IN_PROCESSES_MIN_FILES = 16
+
+# маркер с индексом перед каждым сообщением склеенного батча
+BATCH_MARKER = "§§{}§§ "
+# переводчик может добавить пробелы внутри маркера
+BATCH_MARKER_RE = re.compile(r"\s*§§\s*(\d+)\s*§§\s*")
+
+# хотя бы одна буква (не цифра и не "_"), т.е. есть что переводить.
+# Одной буквы достаточно: однобуквенные слова ("Я") и одиночные
+# иероглифы/кана ("是", "否", "好") тоже нужно переводить
+WORD_RE = re.compile(r"[^\W\d_]")
+URL_RE = re.compile(r"\s*https?://\S+\s*")
+
 
 class Locale(StrEnum):
     """Language codes."""
@@ -45,28 +64,42 @@ class TranslateOpts:
     include_variables: list[str] = field(default_factory=list)
     exclude_variables: list[str] = field(default_factory=list)
 
-    translate_batch_size: int = 5
+    # переводить даже если целевой файл новее исходного
+    force: bool = False
+
+    translate_batch_size: int = 50
+    translate_batch_max_chars: int = 4500
     translate_limit: int = 4
     translate_retry_wait_time: int = 5
     translate_retry_count: int = 3
+    translate_rate: float | None = None
+    translate_rate_period: float = 60.0
+    translate_cache_path: Path | None = None
+    translate_cache_ttl: float | None = None
 
     origin_locale_dir: Path = field(init=False)
+    _include_files_set: frozenset[str] = field(init=False, repr=False)
+    _exclude_files_set: frozenset[str] = field(init=False, repr=False)
 
     def __post_init__(self):
         self.target_locales = list(
             set(filter(lambda x: x != self.origin_locale, self.target_locales))
         )
         self.origin_locale_dir = Path(self.locales_dir, self.origin_locale)
+        self._include_files_set = frozenset(self.include_files)
+        self._exclude_files_set = frozenset(self.exclude_files)
 
     # подходит ли под критерии
     def is_applicable(self, file: Path) -> bool:
-        if self.include_files and file.name not in self.include_files:
+        if self._include_files_set and file.name not in self._include_files_set:
             return False
-        if self.exclude_files and file.name in self.exclude_files:
+        if file.name in self._exclude_files_set:
             return False
         return True
 
-    def create_target_file(self, file: Path, target_locale: str) -> Path:
+    def create_target_file(
+        self, file: Path, target_locale: str, mkdir: bool = True
+    ) -> Path:
         try:
             # Create a relative path from the origin locale directory
             relative_path = file.relative_to(self.origin_locale_dir)
@@ -80,19 +113,97 @@ class TranslateOpts:
         new_file = Path(self.locales_dir, target_locale, relative_path)
 
         # Create parent directories if they don't exist
-        new_file.parent.mkdir(parents=True, exist_ok=True)
+        if mkdir:
+            new_file.parent.mkdir(parents=True, exist_ok=True)
 
         return new_file
 
 
 def parse_ftl_files(locale_dir: Path) -> list[Path]:
-    ftl_files = []
-    for file in locale_dir.iterdir():
-        if file.is_file() and file.suffix == ".ftl":
-            ftl_files.append(file)
-        else:
-            ftl_files.extend(parse_ftl_files(file))
-    return ftl_files
+    return [file for file in locale_dir.rglob("*.ftl") if file.is_file()]
+
+
+def is_up_to_date(file: Path, target_file: Path) -> bool:
+    try:
+        return target_file.stat().st_mtime >= file.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def write_atomic(file: Path, text: str) -> None:
+    """
+    Write text to the file through a temporary file in the same directory,
+    so the file never exists half-written with a fresh mtime.
+    """
+    tmp_file = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+    try:
+        tmp_file.write_text(text, encoding="utf-8")
+        os.replace(tmp_file, file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+
+def parse_message_info(file_text: str) -> list[MessageInfo]:
+    resource = parse(file_text)
+    return MessageInfo.get_message_info(resource)
+
+
+def pack_batches(
+    messages_info: list[MessageInfo], max_size: int, max_chars: int
+) -> list[list[MessageInfo]]:
+    """
+    Greedily pack messages into batches that fit into one request.
+    A batch holds at most max_size messages and at most max_chars characters
+    including index markers; a single longer message gets a batch of its own.
+    """
+    batches: list[list[MessageInfo]] = []
+    batch: list[MessageInfo] = []
+    batch_chars = 0
+    for info in messages_info:
+        # маркер и перевод строки между сообщениями
+        info_chars = len(info.text) + len(BATCH_MARKER.format(len(batch))) + 1
+        if batch and (len(batch) >= max_size or batch_chars + info_chars > max_chars):
+            batches.append(batch)
+            batch = []
+            batch_chars = 0
+        batch.append(info)
+        batch_chars += info_chars
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def parse_files(file_texts: list[str]) -> list[list[MessageInfo]]:
+    # пул процессов окупается только на большом числе файлов
+    # и только если есть хотя бы два ядра
+    cpu_count = os.cpu_count() or 1
+    if len(file_texts) < PARSE_IN_PROCESSES_MIN_FILES or cpu_count < 2:
+        return [parse_message_info(text) for text in file_texts]
+
+    # парсинг fluent упирается в CPU, поэтому раскладываем его по процессам.
+    # fork многопоточного процесса (to_thread уже запустил потоки) небезопасен
+    start_method = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(
+        max_workers=min(len(file_texts), cpu_count),
+        mp_context=multiprocessing.get_context(start_method),
+    )
+    try:
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, parse_message_info, text)
+                for text in file_texts
+            )
+        )
+    finally:
+        # shutdown ждет завершения процессов, не блокируем им event loop
+        await asyncio.to_thread(executor.shutdown)
 
 
 async def translate_batch(
@@ -117,67 +228,177 @@ async def translate_concatenated_batch(
     g_translator: GoogleTranslator,
     target_locale: Locale,
 ) -> list[MessageInfo]:
-    # какой то знак для разделения сообщений. Уникальный
-    separator = "\n[◙]\n"
-    batch_text = separator.join([info.text for info in msg_info_batch])
+    # ссылки, числа и одни переменные не переводим, оставляем как есть
+    to_translate = [info for info in msg_info_batch if not is_passthrough(info.text)]
+    if not to_translate:
+        return msg_info_batch
 
-    translated_batch = await g_translator.translate(batch_text, target=target_locale)
-    logger.debug(f"{batch_text} -> {translated_batch}")
+    # одинаковые тексты отправляем один раз, кэш переводчика работает
+    # по отдельным сообщениям, а не по склеенному батчу
+    texts = list(dict.fromkeys(info.text.strip() for info in to_translate))
 
-    translated_batch = translated_batch.split(separator)
+    async def translate_missing(missing: list[str]) -> list[str]:
+        return await translate_concatenated_texts(missing, g_translator, target_locale)
 
-    for i, info in enumerate(msg_info_batch):
-        try:
-            translated_text = translated_batch[i]
-        except IndexError:
-            logger.warning(f"{batch_text} -> {translated_batch}")
-            raise
-        info.text = translated_text
+    translated_texts = await g_translator.translate_many(
+        texts, translate_missing, target=target_locale
+    )
+
+    translations = dict(zip(texts, translated_texts))
+    for info in to_translate:
+        info.text = translations[info.text.strip()]
     return msg_info_batch
 
 
+async def translate_concatenated_texts(
+    texts: list[str],
+    g_translator: GoogleTranslator,
+    target_locale: Locale,
+) -> list[str]:
+    batch_text = "\n".join(
+        BATCH_MARKER.format(i) + text for i, text in enumerate(texts)
+    )
+
+    # склеенный батч не кэшируем: кэшируются отдельные сообщения
+    translated_batch = await g_translator.translate(
+        batch_text, target=target_locale, use_cache=False
+    )
+    logger.debug(f"{batch_text} -> {translated_batch}")
+
+    translated_texts = split_concatenated_batch(translated_batch, len(texts))
+    if translated_texts is None:
+        # переводчик испортил маркеры, переводим сообщения по отдельности
+        logger.warning(
+            f"Batch markers mismatch, translating one by one: {batch_text} -> {translated_batch}"
+        )
+        return await g_translator.translate_batch(
+            texts, target=target_locale, use_cache=False
+        )
+    return translated_texts
+
+
+def is_passthrough(text: str) -> bool:
+    """
+    Check if the text has nothing to translate: no letters at all
+    (numbers, punctuation, variables only) or a single URL.
+    """
+    return not WORD_RE.search(text) or bool(URL_RE.fullmatch(text))
+
+
+def split_concatenated_batch(translated_batch: str, size: int) -> list[str] | None:
+    """
+    Split a translated batch by its index markers.
+    Returns None if any marker is lost, duplicated or out of order.
+    """
+    head, *chunks = BATCH_MARKER_RE.split(translated_batch)
+    indexes = [int(index) for index in chunks[::2]]
+    if head.strip() or indexes != list(range(size)):
+        return None
+    return [text.strip() for text in chunks[1::2]]
+
+
+async def process_file(
+    messages_info: list[MessageInfo],
+    file: Path,
+    target_file: Path,
+    target_locale: Locale,
+    g_translator: GoogleTranslator,
+    opts: TranslateOpts,
+) -> None:
+    logger.debug(f"Translating {file.name}")
+
+    batches = pack_batches(
+        messages_info, opts.translate_batch_size, opts.translate_batch_max_chars
+    )
+    translated_batches = await gather(
+        *(
+            translate_concatenated_batch(batch, g_translator, target_locale)
+            for batch in batches
+        )
+    )
+
+    parts: list[str] = []
+    for translated_batch in translated_batches:
+        logger.debug(f"Batch size: {len(translated_batch)} translated")
+
+        for info in translated_batch:
+            parts.append(info.to_fluent())
+            parts.append("\n\n")
+
+    # файл пишется сразу, не дожидаясь остальных. Запись атомарная:
+    # недописанный файл со свежим mtime пропускался бы как актуальный
+    await asyncio.to_thread(write_atomic, target_file, "".join(parts))
+
+    logger.info(f"[{opts.origin_locale} -> {target_locale}] Translated {file.name}")
+
+
 async def translate(opts: TranslateOpts):
     ftl_files = parse_ftl_files(opts.origin_locale_dir)
+    applicable_files = [file for file in ftl_files if opts.is_applicable(file)]
+
+    # (целевая локаль, исходный файл, целевой файл)
+    pending: list[tuple[Locale, Path, Path]] = []
+    for target_locale in opts.target_locales:
+        locale_pending = []
+        for file in applicable_files:
+            target_file = opts.create_target_file(file, target_locale, mkdir=False)
+            if not opts.force and is_up_to_date(file, target_file):
+                logger.debug(f"Skipping up-to-date {target_file}")
+                continue
+            locale_pending.append((target_locale, file, target_file))
+
+        # локали, где все файлы актуальны, не трогаем вовсе
+        if not locale_pending:
+            logger.info(f"[{opts.origin_locale} -> {target_locale}] Up to date")
+            continue
+        logger.info(f"[{opts.origin_locale} -> {target_locale}] Translating...")
+        pending.extend(locale_pending)
+
+    if not pending:
+        logger.info("Translation completed")
+        return
+
+    # каталоги создаем один раз, а не на каждый файл
+    for directory in {target_file.parent for _, _, target_file in pending}:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # каждый исходный файл читаем и парсим один раз для всех локалей,
+    # чтение параллельно, не блокируя event loop
+    source_files = list(dict.fromkeys(file for _, file, _ in pending))
+    file_texts = await asyncio.gather(
+        *(
+            asyncio.to_thread(file.read_text, encoding="utf-8")
+            for file in source_files
+        )
+    )
+
+    files_messages_info = dict(zip(source_files, await parse_files(file_texts)))
 
     async with GoogleTranslator(
         source=opts.origin_locale,
         retry_wait_time=opts.translate_retry_wait_time,
         retry_count=opts.translate_retry_count,
         limit=opts.translate_limit,
+        cache_path=opts.translate_cache_path,
+        cache_ttl=opts.translate_cache_ttl,
+        rate=opts.translate_rate,
+        rate_period=opts.translate_rate_period,
     ) as g_translator:
-        for target_locale in opts.target_locales:
-            logger.info(f"[{opts.origin_locale} -> {target_locale}] Translating...")
-
-            for file in ftl_files:
-                if not opts.is_applicable(file):
-                    continue
-                target_file = opts.create_target_file(file, target_locale)
-                logger.debug(f"Translating {file.name}")
-
-                file_text = file.read_text(encoding="utf-8")
-                resource = parse(file_text)
-                messages_info = MessageInfo.get_message_info(resource)
-
-                batches = [
-                    messages_info[i : i + opts.translate_batch_size]
-                    for i in range(0, len(messages_info), opts.translate_batch_size)
-                ]
-
-                translated_text = ""
-                for batch in batches:
-                    translated_batch = await translate_concatenated_batch(
-                        batch, g_translator, target_locale
-                    )
-                    logger.debug(f"Batch size: {len(translated_batch)} translated")
-
-                    for info in translated_batch:
-                        translated_text += info.to_fluent()
-                        translated_text += "\n\n"
-
-                async with aiofiles.open(target_file, "w", encoding="utf-8") as f:
-                    await f.write(translated_text)
-
-                logger.info(
-                    f"[{opts.origin_locale} -> {target_locale}] Translated {file.name}"
+        # файлы всех локалей переводятся и записываются независимо,
+        # параллелизм запросов ограничивается пулом соединений переводчика.
+        # Перевод меняет MessageInfo.text, поэтому каждой локали своя копия.
+        # При первой ошибке остальные задачи отменяются до закрытия сессии
+        await gather(
+            *(
+                process_file(
+                    copy.deepcopy(files_messages_info[file]),
+                    file,
+                    target_file,
+                    target_locale,
+                    g_translator,
+                    opts,
                 )
+                for target_locale, file, target_file in pending
+            )
+        )
     logger.info("Translation completed")
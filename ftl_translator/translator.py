@@ -1,8 +1,20 @@
 import aiohttp
-from typing import List, Optional
+from aiolimiter import AsyncLimiter
+from collections import OrderedDict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
 import asyncio
 import logging
 
+from ftl_translator.cache import TranslationCache
+from ftl_translator.utils import gather
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +39,12 @@ class GoogleTranslator:
     """
 
     BASE_URL = "https://translate.google.com/translate_a/single"
+    RETRY_BACKOFF_FACTOR = 1.5
+    MAX_RETRY_WAIT_TIME = 60
+    KEEPALIVE_TIMEOUT = 75
+    DNS_CACHE_TTL = 300
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 30
 
     def __init__(
         self,
@@ -36,12 +54,22 @@ class GoogleTranslator:
         retry_wait_time: int = 5,
         retry_count: int = 3,
         limit: int = 10,
+        cache_path: str | Path | None = None,
+        cache_ttl: float | None = None,
+        memo_size: int = 10_000,
+        rate: float | None = None,
+        rate_period: float = 60.0,
     ):
         """
         Initialize the translator.
         @param source: source language to translate from
         @param target: target language to translate to
         @param proxies: proxies to be used for the requests
+        @param cache_path: path to the persistent translation cache, None to disable it
+        @param cache_ttl: seconds after which cached translations expire
+        @param memo_size: max number of translations memoized in memory
+        @param rate: max number of requests per rate_period, None for no limit
+        @param rate_period: rate limit window in seconds
         """
         self.source = source
         self.target = target
@@ -55,44 +83,75 @@ class GoogleTranslator:
         }
         self.retry_wait_time = retry_wait_time
         self.retry_count = retry_count
+        # базовые параметры запроса для каждой пары (source, target)
+        self._params_cache: dict[tuple[str, str], dict[str, str]] = {}
+
+        self.limit = limit
+        # заранее ограничиваем частоту запросов, чтобы не получать 429
+        self._limiter = AsyncLimiter(rate, rate_period) if rate else None
+        self.cache = TranslationCache(cache_path, cache_ttl) if cache_path else None
+        # переводы текущего процесса, LRU по (source, target, text)
+        self.memo_size = memo_size
+        self._memo: OrderedDict[tuple[str, str, str], asyncio.Future[str]] = (
+            OrderedDict()
+        )
 
         self.session: Optional[aiohttp.ClientSession] = None
-        self.semaphore = asyncio.Semaphore(limit)
 
     async def __aenter__(self):
         """
         Create and enter an async context with aiohttp.ClientSession.
+        Concurrent requests are capped by the connector pool size.
         """
-        self.session = aiohttp.ClientSession()
+        # кэш открываем первым, чтобы при ошибке не оставить открытую сессию
+        if self.cache:
+            await asyncio.to_thread(self.cache.open)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+        )
+        # ожидание свободного соединения в пуле не ограничиваем:
+        # все запросы ставятся в очередь пула сразу
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.CONNECT_TIMEOUT,
+            sock_read=self.READ_TIMEOUT,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """
-        Close the aiohttp session when exiting the context.
+        Close the aiohttp session and the cache when exiting the context.
         """
         if self.session:
             await self.session.close()
             self.session = None
+        if self.cache:
+            await asyncio.to_thread(self.cache.close)
 
     async def _request(self, params: dict) -> list:
         assert self.session is not None, "Session is not initialized"
-        async with self.semaphore:
-            async with self.session.get(
-                self.BASE_URL,
-                params=params,
-                proxy=self.proxy,
-            ) as response:
-                if response.status == 429:
-                    raise TooManyRequestsError()
-                elif not response.ok:
-                    raise TranslationError(response.text)
-                else:
-                    result = await response.json()
-                    if not result or not isinstance(result, list) or not result[0]:
-                        raise TranslationError(
-                            f"Translation not found: {await response.text()}"
-                        )
-                    return result[0]
+        async with self._limiter or nullcontext(), self.session.get(
+            self.BASE_URL,
+            params=params,
+            proxy=self.proxy,
+        ) as response:
+            if response.status == 429:
+                raise TooManyRequestsError()
+            elif not response.ok:
+                raise TranslationError(response.text)
+            else:
+                # парсим байты напрямую, без декодирования в str
+                result = json_loads(await response.read())
+                if not result or not isinstance(result, list) or not result[0]:
+                    raise TranslationError(
+                        f"Translation not found: {await response.text()}"
+                    )
+                return result[0]
 
     async def translate(
         self,
@@ -100,56 +159,202 @@ class GoogleTranslator:
         source: str | None = None,
         target: str | None = None,
         retry_count: int | None = None,
+        use_cache: bool = True,
     ) -> str:
         """
         Function to translate a text.
         @param text: desired text to translate
+        @param use_cache: look the text up in the memo and the persistent cache
         @return: str: translated text
         """
         if not self._is_input_valid(text, max_chars=5000):
             raise ValueError("Invalid input: text is too long or empty.")
 
-        params = self.params.copy()
-        if source:
-            params["sl"] = source
-        if target:
-            params["tl"] = target
-        params["q"] = text.strip()
+        params = {**self._get_params(source, target), "q": text.strip()}
 
         if not self.session:
             raise RuntimeError(
                 "Session is not initialized. Use 'async with' to create a session."
             )
 
-        try:
-            items = await self._request(params)
-            translated_text = "".join([item[0] for item in items if item[0]])
+        if not use_cache:
+            return await self._translate(params, retry_count)
 
-            logger.debug(
-                f"[{params["sl"]} -> {params["tl"]}] Translated: {text} -> {translated_text}"
-            )
+        async def translate_missing(texts: list[str]) -> list[str]:
+            return [await self._translate(params, retry_count)]
 
-            return translated_text
-        except TooManyRequestsError as e:
-            if retry_count is None:
-                retry_count = self.retry_count
-            else:
-                retry_count -= 1
+        (translated_text,) = await self.translate_many(
+            [params["q"]], translate_missing, source, target
+        )
+        return translated_text
+
+    async def _translate(self, params: dict, retry_count: int | None = None) -> str:
+        """
+        Translate params["q"] with a request, retrying on 429.
+        @param params: request params
+        @return: str: translated text
+        """
+        text = params["q"]
+        if retry_count is None:
+            retry_count = self.retry_count
+        retry_count = max(retry_count, 0)
 
-            if retry_count < 0:
-                raise e
+        for attempt in range(retry_count + 1):
+            try:
+                items = await self._request(params)
+                break
+            except TooManyRequestsError:
+                if attempt == retry_count:
+                    raise
 
-            logger.warning(
-                f"Too many requests. Please try again later. Retry count: {retry_count}. "
-                f"Retry wait time: {self.retry_wait_time}"
-            )
-            await asyncio.sleep(self.retry_wait_time)
-            return await self.translate(
-                text,
-                source,
-                target,
-                retry_count=retry_count,
+                wait_time = self._retry_wait_time(attempt)
+                logger.warning(
+                    f"Too many requests. Please try again later. "
+                    f"Retry count: {retry_count - attempt}. "
+                    f"Retry wait time: {wait_time}"
+                )
+                await asyncio.sleep(wait_time)
+        else:
+            # недостижимо: последняя попытка пробрасывает ошибку выше
+            raise TooManyRequestsError()
+
+        translated_text = "".join([item[0] for item in items if item[0]])
+
+        logger.debug(
+            f"[{params['sl']} -> {params['tl']}] Translated: {text} -> {translated_text}"
+        )
+
+        return translated_text
+
+    async def translate_many(
+        self,
+        texts: List[str],
+        translate_missing: Callable[[List[str]], Awaitable[List[str]]],
+        source: str | None = None,
+        target: str | None = None,
+    ) -> List[str]:
+        """
+        Translate texts through the in-process memo and the persistent cache,
+        message by message.
+        @param texts: unique stripped texts to translate
+        @param translate_missing: translates the texts missing from both in one call
+        @return: list of translations in the order of texts
+        """
+        source, target = source or self.source, target or self.target
+
+        translations: dict[str, str] = {}
+        pending = list(texts)
+        while pending:
+            futures, owned = self._claim(pending, source, target)
+            if owned:
+                await self._translate_owned(
+                    futures, owned, translate_missing, source, target
+                )
+
+            # если владелец текста отменен, а этот вызов нет, текст
+            # забирается заново, а не получает чужую отмену
+            cancelled: list[str] = []
+            for text in pending:
+                try:
+                    translations[text] = await asyncio.shield(futures[text])
+                except asyncio.CancelledError:
+                    task = asyncio.current_task()
+                    if not futures[text].cancelled() or (
+                        task is not None and task.cancelling()
+                    ):
+                        raise
+                    cancelled.append(text)
+            pending = cancelled
+
+        return [translations[text] for text in texts]
+
+    def _claim(
+        self, texts: List[str], source: str, target: str
+    ) -> tuple[dict[str, asyncio.Future[str]], list[str]]:
+        """
+        Get memo futures for texts, creating them for texts not in the memo.
+        @return: text -> future, and the texts this call has to translate
+        """
+        # тексты без записи в memo переводит этот вызов, остальные уже
+        # переведены или переводятся другим вызовом прямо сейчас
+        loop = asyncio.get_running_loop()
+        futures: dict[str, asyncio.Future[str]] = {}
+        owned: list[str] = []
+        for text in texts:
+            key = (source, target, text)
+            future = self._memo.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._memo[key] = future
+                owned.append(text)
+            else:
+                self._memo.move_to_end(key)
+            futures[text] = future
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return futures, owned
+
+    async def _translate_owned(
+        self,
+        futures: dict[str, asyncio.Future[str]],
+        owned: List[str],
+        translate_missing: Callable[[List[str]], Awaitable[List[str]]],
+        source: str,
+        target: str,
+    ) -> None:
+        """
+        Translate the claimed texts and resolve their memo futures.
+        On failure the unresolved futures are evicted from the memo and
+        get the error (or cancellation), then it is re-raised.
+        """
+        try:
+            translations = await self._translate_uncached(
+                owned, translate_missing, source, target
             )
+            # свои тексты отдаем до ожидания чужих, чтобы вызовы не ждали друг друга
+            for text in owned:
+                futures[text].set_result(translations[text])
+        except BaseException as e:
+            for text in owned:
+                future = futures[text]
+                if future.done():
+                    continue
+                if self._memo.get((source, target, text)) is future:
+                    del self._memo[(source, target, text)]
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    # ошибку получат ожидающие, не логируем ее как необработанную
+                    future.exception()
+            raise
+
+    async def _translate_uncached(
+        self,
+        texts: List[str],
+        translate_missing: Callable[[List[str]], Awaitable[List[str]]],
+        source: str,
+        target: str,
+    ) -> dict[str, str]:
+        """
+        Translate texts through the persistent cache only.
+        @return: dict: text -> translated text
+        """
+        if not self.cache:
+            return dict(zip(texts, await translate_missing(texts), strict=True))
+
+        translations = await asyncio.to_thread(
+            self.cache.get_many, texts, source, target
+        )
+        if translations:
+            logger.debug(f"[{source} -> {target}] Cached: {len(translations)} texts")
+
+        missing = [text for text in texts if text not in translations]
+        if missing:
+            translated = dict(zip(missing, await translate_missing(missing), strict=True))
+            await asyncio.to_thread(self.cache.set_many, translated, source, target)
+            translations.update(translated)
+        return translations
 
     async def translate_file(self, path: str) -> str:
         """
@@ -171,16 +376,44 @@ class GoogleTranslator:
         batch: List[str],
         source: str | None = None,
         target: str | None = None,
+        use_cache: bool = True,
     ) -> List[str]:
         """
         Translate a list of texts.
         @param batch: list of texts to translate
+        @param use_cache: look the texts up in the memo and the persistent cache
         @return: list of translations
         """
-        return await asyncio.gather(
-            *(self.translate(text, source=source, target=target) for text in batch)
+        return await gather(
+            *(
+                self.translate(text, source=source, target=target, use_cache=use_cache)
+                for text in batch
+            )
         )
 
+    def _get_params(self, source: str | None, target: str | None) -> dict[str, str]:
+        """
+        Get cached base request params for a language pair.
+        @param source: source language, defaults to self.source
+        @param target: target language, defaults to self.target
+        @return: dict: params without the text to translate
+        """
+        key = (source or self.source, target or self.target)
+        params = self._params_cache.get(key)
+        if params is None:
+            params = {**self.params, "sl": key[0], "tl": key[1]}
+            self._params_cache[key] = params
+        return params
+
+    def _retry_wait_time(self, attempt: int) -> float:
+        """
+        Exponential backoff for retries after 429.
+        @param attempt: zero-based retry number
+        @return: float: seconds to wait, capped at MAX_RETRY_WAIT_TIME
+        """
+        wait_time = self.retry_wait_time * self.RETRY_BACKOFF_FACTOR**attempt
+        return max(self.retry_wait_time, min(wait_time, self.MAX_RETRY_WAIT_TIME))
+
     def _is_input_valid(self, text: str, max_chars: int = 5000) -> bool:
         """
         Check if the input is valid.
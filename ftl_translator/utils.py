@@ -0,0 +1,22 @@
+import asyncio
+from typing import Awaitable, List, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather(*aws: Awaitable[T]) -> List[T]:
+    """
+    Like asyncio.gather, but on the first error (or cancellation) cancels
+    the remaining tasks and waits for them before re-raising, so none of
+    them outlives the caller.
+    @param aws: awaitables to run concurrently
+    @return: list of results in the order of aws
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise